@@ -1,22 +1,62 @@
 from collections import UserDict
-from datetime import datetime
+from datetime import date
+from itertools import islice
+from types import MappingProxyType
 import pickle
 import csv
+import re
+import sys
+
+
+_PHONE_RE = re.compile(r"^\+380\d{9}\Z").match
+_BIRTHDAY_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})\Z", re.ASCII).match
+
+
+def _parse_ddmmyyyy(s: str) -> date:
+    match = _BIRTHDAY_RE(s)
+    if not match:
+        raise ValueError(f"{s!r} does not match dd.mm.yyyy")
+    day, month, year = map(int, match.groups())
+    return date(year, month, day)
+
+
+def validate_phone(phone: str) -> str:
+    if not phone or not _PHONE_RE(phone):
+        raise ValueError("Invalid phone number format")
+    return phone
 
 
 class Field:
+    __slots__ = ('_value',)
+
     def __init__(self, value):
         self.value = value
 
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+
+    def __setstate__(self, state):
+        # fields pickled before __slots__ carry a plain __dict__
+        if isinstance(state, tuple):
+            state = state[1]
+        self._value = state['_value'] if '_value' in state else state['value']
+
     def __str__(self):
         return str(self.value)
 
 
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
 
@@ -26,24 +66,12 @@ class Phone(Field):
 
     @value.setter
     def value(self, new_value):
-        if not self.is_valid_phone(new_value):
-            raise ValueError("Invalid phone number format")
-        self._value = new_value
-
-    @staticmethod
-    def is_valid_phone(phone):
-        if phone:
-            if not phone.startswith("+380"):
-                return False
-            if len(phone) != 13:
-                return False
-            if not phone[4:].isdigit():
-                return False
-            return True
-        return True
+        self._value = validate_phone(new_value)
 
 
 class Birthday(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
 
@@ -60,149 +88,239 @@ class Birthday(Field):
     @staticmethod
     def is_valid_date(birthday):
         try:
-            datetime.datetime.strptime(birthday, "%d.%m.%Y")
+            _parse_ddmmyyyy(birthday)
             return True
-        except ValueError:
+        except (ValueError, TypeError):
             return False
 
 
 class Record:
-    def __init__(self, name: Name, phone: Phone = None, birthday: Birthday = None):
+    __slots__ = ('name', 'phones', 'birthday', '_bd_md')
+
+    def __init__(self, name: Name, phone: str = None, birthday: Birthday = None):
         self.name = name
-        self.phones = []
-        self.birthday = birthday
+        self.phones = {}
+        self.birthday = None
+        self._bd_md = None
         if phone is not None:
             self.add_phone(phone)
         if birthday is not None:
             self.set_birthday(birthday)
     
-    def add_phone(self, phone: Phone):
+    def add_phone(self, phone: str):
+        phone = validate_phone(str(phone))
         if phone not in self.phones:
-            self.phones.append(phone)
+            self.phones[phone] = None
             return f"Phone {phone} added to contact {self.name}"
         return f"{phone} already added to {self.name}"
 
     def remove_phone(self, phone):
-        self.phones = [p for p in self.phones if str(p) != phone]
+        self.phones.pop(str(phone), None)
 
     def change_phone(self, old_phone, new_phone):
-        for i, phone in enumerate(self.phones):
-            if str(phone) == str(old_phone):
-                self.phones[i] = new_phone
-                break
+        old_phone = str(old_phone)
+        if old_phone not in self.phones:
+            return
+        new_phone = validate_phone(str(new_phone))
+        if new_phone == old_phone:
+            return
+        if new_phone in self.phones:
+            # the new number is already listed, so only the old one goes away
+            del self.phones[old_phone]
+            return
+        # rebuilt to keep the replaced number in its position, O(k) in phones
+        self.phones = {(new_phone if phone == old_phone else phone): None for phone in self.phones}
             
     def set_birthday(self, birthday):
         try:
-            self.birthday = datetime.strptime(birthday, "%d.%m.%Y").date()
+            self.birthday = _parse_ddmmyyyy(str(birthday))
+            self._bd_md = (self.birthday.month, self.birthday.day)
             return f"Birthday set for {self.name}"
         except ValueError:
             return f"Invalid birthday format. Please use dd.mm.yyyy format."
             
+    def _birthday_in(self, year):
+        month, day = self._bd_md
+        try:
+            return date(year, month, day)
+        except ValueError:
+            # 29.02 is celebrated on 28.02 in non-leap years
+            return date(year, 2, 28)
+
     def days_to_birthday(self):
         if self.birthday is None:
             return "Birthday not set"
         
-        current_date = datetime.now().date()
-        next_birthday = datetime(current_date.year, self.birthday.month, self.birthday.day).date()
-        
-        if next_birthday < current_date: 
-            next_birthday = datetime(current_date.year + 1, self.birthday.month, self.birthday.day).date()
-            
+        current_date = date.today()
+        next_birthday = self._birthday_in(current_date.year)
+
+        if next_birthday < current_date:
+            next_birthday = self._birthday_in(current_date.year + 1)
+
         days_to_bd = (next_birthday - current_date).days
         return f"Days to next birthday for {self.name}: {days_to_bd}"
 
     def __str__(self):
-        return f"Name: {self.name}, Phones: {', '.join(str(p) for p in self.phones)}"
+        return f"Name: {self.name}, Phones: {', '.join(self.phones)}"
+
+    def _dump(self):
+        birthday = self.birthday.isoformat() if self.birthday else None
+        return str(self.name), list(self.phones), birthday
+
+    @classmethod
+    def _rebuild(cls, name, phones, birthday):
+        record = cls(Name(name))
+        record.phones = dict.fromkeys(phones)
+        if birthday is not None:
+            record.birthday = date.fromisoformat(birthday)
+            record._bd_md = (record.birthday.month, record.birthday.day)
+        return record
+
+    def __reduce__(self):
+        return Record._rebuild, self._dump()
+
+    def __setstate__(self, state):
+        # records pickled before __slots__ carry a plain __dict__
+        self.name = state['name']
+        # the old add command stored Phone(None) for contacts added without a number
+        self.phones = dict.fromkeys(phone.value for phone in state['phones'] if phone.value)
+        self.birthday = state['birthday']
+        self._bd_md = (self.birthday.month, self.birthday.day) if self.birthday else None
 
 
 class AddressBook(UserDict):
+    def __init__(self, *args, **kwargs):
+        self._by_lower = {}
+        self._search_index = {}
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, record):
+        self.data[key] = record
+        self._by_lower[key.lower()] = record
+        self._index_record(key, record)
+
+    def __delitem__(self, key):
+        record = self.data.pop(key)
+        if self._by_lower.get(key.lower()) is record:
+            del self._by_lower[key.lower()]
+        del self._search_index[key]
+
     def add_record(self, record):
-        self.data[str(record.name)] = record
+        self[str(record.name)] = record
 
     def remove_record(self, name):
-        del self.data[str(name)]
+        del self[str(name)]
         return f"{name} record deleted"
 
+    def get_record(self, name):
+        return self.data.get(name) or self._by_lower.get(name.lower())
+
     def search_by_name(self, name):
-        results = []
-        for record in self.data.values():
-            if str(record.name) == name:
-                results.append(record)
-        return results
+        record = self.get_record(name)
+        return [record] if record else []
 
     def change_phone_by_name(self, name, new_phone):
-        results = self.search_by_name(name)
-        for result in results:
-            result.change_phone(result.phones[0], Phone(new_phone))
+        record = self.get_record(name)
+        if record is None:
+            raise KeyError(name)
+        if record.phones:
+            record.change_phone(next(iter(record.phones)), new_phone)
+        else:
+            record.add_phone(new_phone)
+        self._index_record(str(record.name), record)
 
     def __str__(self):
         return "\n".join(str(record) for record in self.data.values())
+
+    @classmethod
+    def _rebuild(cls, records):
+        book = cls()
+        for fields in records:
+            book.add_record(Record._rebuild(*fields))
+        return book
+
+    def __reduce__(self):
+        # records are pickled as plain tuples, without per-field class metadata
+        return AddressBook._rebuild, ([record._dump() for record in self.data.values()],)
     
     def iterator(self, n=None):
-        records = list(self.data.values())
-        
-        if n is None: 
-            yield records
-        else:   
-            total_records = len(records)
-            current_index = 0
-
-        while current_index < total_records:
-            yield records[current_index:current_index+n]
-            current_index += n
+        records = iter(self.data.values())
+
+        if n is None:
+            yield list(records)
+            return
+
+        while True:
+            chunk = list(islice(records, n))
+            if not chunk:
+                return
+            yield chunk
             
     def show_all(self, n=None):
         iterator = self.iterator(n)
         for chunk in iterator:
-            print("\n".join(str(record) for record in chunk))
+            sys.stdout.write("\n".join(str(record) for record in chunk) + "\n")
             if n is None or len(chunk) < n:
                 break
             
     def load(self, file):
         try:
             with open(file, 'rb') as f:
-                self.data = pickle.load(f)
+                book = pickle.load(f)
         except FileNotFoundError:
-            self.data = {}
+            book = {}
+        self.data = {}
+        self._by_lower = {}
+        self._search_index = {}
+        # files written before AddressBook.__reduce__ hold the bare dict
+        self.update(book)
             
     def save(self, file):
+        data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
         with open(file, 'wb') as f:
-            pickle.dump(self.data, f)          
+            f.write(data)
             
     def save_csv(self, file):
-        with open(file, 'w', newline='') as fh:
+        with open(file, 'w', newline='', buffering=1 << 16) as fh:
             writer = csv.writer(fh)
-            writer.writerow(self.data)
-                
-            
+            writer.writerows(
+                (
+                    name,
+                    ';'.join(record.phones),
+                    record.birthday.strftime('%d.%m.%Y') if record.birthday else '',
+                )
+                for name, record in self.data.items()
+            )
+
+    def _index_record(self, key, record):
+        # phones are validated digits, only the name needs lowercasing
+        self._search_index[key] = (key.lower(), *record.phones)
+
     def search(self, query):
-        search_results = []
         query = query.lower()
-         
-        for record in self.data.values():
-            if query in str(record.name).lower():
-                search_results.append(record)
-            else:
-                for phone in record.phones:
-                    if query in str(phone).lower():
-                        search_results.append(record)
-                
-        return search_results
+        return [
+            self.data[key]
+            for key, texts in self._search_index.items()
+            if any(query in text for text in texts)
+        ]
+
+_HELP = "Available commands:\n" \
+        "- hello\n" \
+        "- add [name] [phone in format +380xxxxxxx]\n" \
+        "- change [name] [phone]\n" \
+        "- find [name]\n" \
+        "- show_all\n" \
+        "- show\n" \
+        "- birthday [name] [date in format dd.mm.yyyy]\n" \
+        "- days_to_bd [name]\n" \
+        "- help \n" \
+        "- del [name] \n" \
+        "- search [string] (>3 symbols) \n" \
+        "- bye, close, exit"
+
 
 def help() -> str:
-    return "Available commands:\n" \
-           "- hello\n" \
-           "- add [name] [phone in format +380xxxxxxx]\n" \
-           "- change [name] [phone]\n" \
-           "- find [name]\n" \
-           "- show_all\n" \
-           "- show\n" \
-           "- birthday [name] [date in format dd.mm.yyyy]\n" \
-           "- days_to_bd [name]\n" \
-           "- help \n" \
-           "- del [name] \n" \
-           "- search [string] (>3 symbols) \n" \
-           "- bye, close, exit"
+    return _HELP
 
 
 def input_error(func):
@@ -215,8 +333,8 @@ def input_error(func):
             return "invalid format, type help"
         except IndexError:
             return "Invalid input"
-        except Exception:
-            return help()
+        except TypeError:
+            return _HELP
 
     return wrapper
 
@@ -225,17 +343,16 @@ ab = AddressBook()
 
 def add(name: str, phone: str = None, birthday: str = None) -> str:
     try:
-        record: Record = ab.get(str(name))
+        record: Record = ab.get_record(str(name))
         if record:
-            existing_phones = [str(p) for p in record.phone]
-            if phone in existing_phones:
+            if phone in record.phones:
                 return f"{phone} already added to {name}"
-            new_phone = Phone(phone)
-            return record.add_phone(new_phone)
+            result = record.add_phone(phone)
+            ab.add_record(record)
+            return result
         name_field = Name(name)
-        phone_field = Phone(phone)
         birthday_field = Birthday(birthday) if birthday else None
-        record = Record(name_field, phone_field, birthday_field)
+        record = Record(name_field, phone, birthday_field)
         ab.add_record(record)
         return f"Contact {name} add success"
     except ValueError as e:
@@ -253,7 +370,7 @@ def find(name: str) -> str:
 
 @input_error
 def change(name: str, new_phone: str) -> str:
-    rec: Record = ab.get(str(name))
+    rec: Record = ab.get_record(str(name))
     if rec: 
         ab.change_phone_by_name(name, new_phone)
         return f"phone number for {name} updated"
@@ -265,9 +382,7 @@ def show_all(*args) -> str:
         n = int(args[0])
         iterator = ab.iterator(n)
         for chunk in iterator:
-            # print (chunk)
-            for record in chunk:
-                print(record)
+            sys.stdout.write("\n".join(map(str, chunk)) + "\n")
             choice = input("Press Enter to continue or 'q' to quit: ")
             if choice.lower() == "q":
                 break
@@ -277,7 +392,7 @@ def show_all(*args) -> str:
 
 @input_error
 def set_birthday(name: str, birthday: str) -> str:
-    rec: Record = ab.get(str(name))
+    rec: Record = ab.get_record(str(name))
     if rec:
         return rec.set_birthday(birthday)
     return f"No {name} in contacts"
@@ -285,7 +400,7 @@ def set_birthday(name: str, birthday: str) -> str:
 
 @input_error
 def days_to_birthday(name: str) -> str:
-    rec: Record = ab.get(str(name))
+    rec: Record = ab.get_record(str(name))
     if rec:
         return rec.days_to_birthday()
     return f"No {name} in contacts"
@@ -308,9 +423,9 @@ def close() -> str:
 
 @input_error
 def remove(name:str) -> str:
-    rec: Record = ab.get(str(name))
+    rec: Record = ab.get_record(str(name))
     if rec:
-        return ab.remove_record(name)
+        return ab.remove_record(rec.name)
     return f"No {name} in contacts"
 
 @input_error
@@ -326,7 +441,7 @@ def search(*args) -> str:
         return "Invalid search, try 3 symbols or more after search command"
 
 
-commands = {
+commands = MappingProxyType({
     "hello": hello,
     "hi": hello,
     "add": add,
@@ -343,19 +458,14 @@ commands = {
     "days_to_bd": days_to_birthday,
     "search": search,
     "del": remove
-}
+})
 
 @input_error
 def parser(text: str) -> tuple[callable, tuple[str]]:
-    text_lower = text.lower()
-    words = text_lower.split()
-
-    if words[0] in commands:
-        command = commands[words[0]]
-        args = tuple(words[1:])
-        return command, args
-
-    return no_command, ()
+    words = text.split()
+    if not words:
+        return no_command, ()
+    return commands.get(words[0].lower(), no_command), tuple(words[1:])
 
 
 def main():